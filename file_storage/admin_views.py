@@ -1,7 +1,7 @@
 from django.contrib.admin.views.decorators import staff_member_required
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
-from django.db.models import Count, Sum
+from django.db.models import Count, Q, Sum
 from django.utils import timezone
 from django.contrib import messages
 from .models import FileNode, StoredFile, FileChunk, ChunkStatus
@@ -24,18 +24,22 @@ def admin_dashboard(request):
 
     # Storage statistics
     total_files = StoredFile.objects.count()
-    total_chunks = FileChunk.objects.count()
-    original_chunks = FileChunk.objects.filter(is_replica=False).count()
-    replica_chunks = FileChunk.objects.filter(is_replica=True).count()
 
-    # Calculate total storage
-    total_bytes = FileChunk.objects.aggregate(
-        total=Sum('size_bytes')
-    )['total'] or 0
-
-    # Calculate health metrics
-    corrupt_chunks = FileChunk.objects.filter(status=ChunkStatus.CORRUPT).count()
-    failed_chunks = FileChunk.objects.filter(status=ChunkStatus.FAILED).count()
+    # Chunk counts, total storage and health metrics in one query
+    chunk_stats = FileChunk.objects.aggregate(
+        total=Count('id'),
+        originals=Count('id', filter=Q(is_replica=False)),
+        replicas=Count('id', filter=Q(is_replica=True)),
+        total_bytes=Sum('size_bytes'),
+        corrupt=Count('id', filter=Q(status=ChunkStatus.CORRUPT)),
+        failed=Count('id', filter=Q(status=ChunkStatus.FAILED)),
+    )
+    total_chunks = chunk_stats['total']
+    original_chunks = chunk_stats['originals']
+    replica_chunks = chunk_stats['replicas']
+    total_bytes = chunk_stats['total_bytes'] or 0
+    corrupt_chunks = chunk_stats['corrupt']
+    failed_chunks = chunk_stats['failed']
 
     # Get recent activity
     recent_files = StoredFile.objects.order_by('-upload_date')[:10]
@@ -105,10 +109,11 @@ def admin_node_management(request):
                 messages.success(request, f"Node '{node.name}' set to maintenance mode.")
             elif action == 'delete':
                 # Check if node has chunks
-                if node.stored_chunks.count() > 0:
+                chunk_count = node.stored_chunks.count()
+                if chunk_count:
                     messages.error(
                         request,
-                        f"Cannot delete node '{node.name}' as it contains {node.stored_chunks.count()} chunks. "
+                        f"Cannot delete node '{node.name}' as it contains {chunk_count} chunks. "
                         f"Migrate chunks to another node first."
                     )
                 else:
@@ -118,7 +123,8 @@ def admin_node_management(request):
 
         return redirect('admin:node_management')
 
-    # Get node health information
+    # Get node health information, with every node's chunk counts from one query
+    nodes = SystemHealth.annotate_chunk_counts(nodes)
     for node in nodes:
         node.health_info = SystemHealth.get_node_health(node)
 
@@ -251,7 +257,7 @@ def admin_system_maintenance(request):
 @staff_member_required
 def ajax_node_status(request):
     """AJAX endpoint to get real-time node status"""
-    nodes = FileNode.objects.all()
+    nodes = SystemHealth.annotate_chunk_counts(FileNode.objects.all())
     node_data = []
 
     for node in nodes:
@@ -2,6 +2,7 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.db.models import Count
 from .models import FileNode, FileChunk, ChunkStatus, StoredFile
 from .health import SystemHealth
 import json
@@ -11,11 +12,12 @@ import uuid
 @login_required
 def get_node_status(request):
     """API endpoint to get status of all nodes"""
-    nodes = FileNode.objects.all()
+    # Count each node's chunks in the same query
+    nodes = FileNode.objects.annotate(chunk_count=Count('stored_chunks'))
 
     nodes_data = []
     for node in nodes:
-        chunks = node.stored_chunks.count()
+        chunks = node.chunk_count
         nodes_data.append({
             'id': node.id,
             'name': node.name,
@@ -101,7 +103,7 @@ def file_health(request, file_id):
 @login_required
 def all_nodes_health(request):
     """API endpoint to get health status of all nodes"""
-    nodes = FileNode.objects.all()
+    nodes = SystemHealth.annotate_chunk_counts(FileNode.objects.all())
     nodes_health = [SystemHealth.get_node_health(node) for node in nodes]
 
     return JsonResponse({
@@ -113,8 +115,9 @@ def all_nodes_health(request):
 @login_required
 def user_files_health(request):
     """API endpoint to get health status of all files owned by user"""
-    files = StoredFile.objects.filter(uploader=request.user)
-    files_health = [SystemHealth.get_file_health(f) for f in files]
+    # Load every file's chunks in one query
+    files = StoredFile.objects.filter(uploader=request.user).prefetch_related('chunks')
+    files_health = [SystemHealth.get_file_health_from_prefetched(f, f.chunks.all()) for f in files]
 
     # Calculate overall statistics
     total_files = len(files_health)
@@ -145,7 +148,7 @@ def admin_system_health(request):
     overall_status = SystemHealth.get_overall_status()
 
     # Node details
-    nodes = FileNode.objects.all()
+    nodes = SystemHealth.annotate_chunk_counts(FileNode.objects.all())
     nodes_health = [SystemHealth.get_node_health(node) for node in nodes]
 
     # File stats
@@ -153,8 +156,8 @@ def admin_system_health(request):
 
     # Files with issues
     files_with_issues = []
-    for stored_file in StoredFile.objects.all():
-        health = SystemHealth.get_file_health(stored_file)
+    for stored_file in StoredFile.objects.prefetch_related('chunks'):
+        health = SystemHealth.get_file_health_from_prefetched(stored_file, stored_file.chunks.all())
         if health['health_status'] != 'healthy':
             files_with_issues.append(health)
 
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FileStorageConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'file_storage'
+
+    def ready(self):
+        # Register the dashboard cache invalidation receivers
+        from . import signals  # noqa: F401
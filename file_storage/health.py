@@ -1,4 +1,5 @@
 import logging
+from django.db.models import Count, Q
 from django.utils import timezone
 from .models import FileNode, StoredFile, FileChunk, ChunkStatus
 
@@ -17,20 +18,28 @@ class SystemHealth:
             dict: System health status
         """
         # Check node status
-        nodes = FileNode.objects.all()
-        active_nodes = nodes.filter(status='active').count()
+        node_stats = FileNode.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='active')),
+        )
+        total_nodes = node_stats['total']
+        active_nodes = node_stats['active']
 
         # Check file integrity
-        files = StoredFile.objects.all()
-        total_files = files.count()
+        total_files = StoredFile.objects.count()
 
         # Check chunk status
-        total_chunks = FileChunk.objects.count()
-        corrupt_chunks = FileChunk.objects.filter(status=ChunkStatus.CORRUPT).count()
-        failed_chunks = FileChunk.objects.filter(status=ChunkStatus.FAILED).count()
+        chunk_stats = FileChunk.objects.aggregate(
+            total=Count('id'),
+            corrupt=Count('id', filter=Q(status=ChunkStatus.CORRUPT)),
+            failed=Count('id', filter=Q(status=ChunkStatus.FAILED)),
+        )
+        total_chunks = chunk_stats['total']
+        corrupt_chunks = chunk_stats['corrupt']
+        failed_chunks = chunk_stats['failed']
 
         # Calculate health metrics
-        node_health = (active_nodes / nodes.count()) * 100 if nodes.count() > 0 else 0
+        node_health = (active_nodes / total_nodes) * 100 if total_nodes > 0 else 0
         chunk_health = ((
                                     total_chunks - corrupt_chunks - failed_chunks) / total_chunks) * 100 if total_chunks > 0 else 100
 
@@ -46,7 +55,7 @@ class SystemHealth:
             'status': status,
             'timestamp': timezone.now().isoformat(),
             'nodes': {
-                'total': nodes.count(),
+                'total': total_nodes,
                 'active': active_nodes,
                 'health_percentage': round(node_health, 2)
             },
@@ -62,17 +71,49 @@ class SystemHealth:
         }
 
     @staticmethod
+    def annotate_chunk_counts(nodes):
+        """
+        Annotate nodes with the chunk counts get_node_health reports, so the
+        health of many nodes can be collected in a single query
+
+        Args:
+            nodes: FileNode queryset
+
+        Returns:
+            QuerySet: The nodes with total_chunks, corrupt_chunks and failed_chunks
+        """
+        return nodes.annotate(
+            total_chunks=Count('stored_chunks'),
+            corrupt_chunks=Count('stored_chunks', filter=Q(stored_chunks__status=ChunkStatus.CORRUPT)),
+            failed_chunks=Count('stored_chunks', filter=Q(stored_chunks__status=ChunkStatus.FAILED)),
+        )
+
     @staticmethod
     def get_node_health(node):
         """
         Get health status for a specific node
 
         Args:
-            node: FileNode instance
+            node: FileNode instance, optionally from annotate_chunk_counts()
 
         Returns:
             dict: Node health details
         """
+        # Use the annotated chunk counts if present, otherwise count in one query
+        if hasattr(node, 'total_chunks'):
+            total_chunks = node.total_chunks
+            corrupt_chunks = node.corrupt_chunks
+            failed_chunks = node.failed_chunks
+        else:
+            chunk_stats = node.stored_chunks.aggregate(
+                total=Count('id'),
+                corrupt=Count('id', filter=Q(status=ChunkStatus.CORRUPT)),
+                failed=Count('id', filter=Q(status=ChunkStatus.FAILED)),
+            )
+            total_chunks = chunk_stats['total']
+            corrupt_chunks = chunk_stats['corrupt']
+            failed_chunks = chunk_stats['failed']
+
         # For inactive nodes, always return 0% health
         if node.status != 'active':
             return {
@@ -83,7 +124,7 @@ class SystemHealth:
                 'hostname': node.hostname,
                 'port': node.port,
                 'chunks': {
-                    'total': node.stored_chunks.count(),
+                    'total': total_chunks,
                     'corrupt': 0,
                     'failed': 0,
                     'health_percentage': 0
@@ -94,11 +135,6 @@ class SystemHealth:
         # For active nodes, check availability and calculate health
         is_available = True  # For testing, assume available
 
-        # Get chunks on this node
-        total_chunks = node.stored_chunks.count()
-        corrupt_chunks = node.stored_chunks.filter(status=ChunkStatus.CORRUPT).count()
-        failed_chunks = node.stored_chunks.filter(status=ChunkStatus.FAILED).count()
-
         # Calculate health percentage
         if total_chunks > 0:
             chunk_health = ((total_chunks - corrupt_chunks - failed_chunks) / total_chunks) * 100
@@ -142,70 +178,70 @@ class SystemHealth:
         Returns:
             dict: File health details
         """
-        # Get all chunks for this file
-        chunks = stored_file.chunks.all()
-        total_chunks = chunks.filter(is_replica=False).count()
-        corrupt_chunks = chunks.filter(is_replica=False, status=ChunkStatus.CORRUPT).count()
-        failed_chunks = chunks.filter(is_replica=False, status=ChunkStatus.FAILED).count()
+        # Load all chunks for this file (originals and replicas) in one query
+        return SystemHealth.get_file_health_from_prefetched(stored_file, list(stored_file.chunks.all()))
+
+    @staticmethod
+    def get_file_health_from_prefetched(stored_file, chunks):
+        """
+        Get health status for a file from its already loaded chunks
+
+        Args:
+            stored_file: StoredFile instance
+            chunks: All FileChunk instances of the file, originals and replicas,
+                e.g. from prefetch_related('chunks')
+
+        Returns:
+            dict: File health details
+        """
+        original_chunks = [c for c in chunks if not c.is_replica]
+        replicated_numbers = {
+            c.chunk_number for c in chunks
+            if c.is_replica and c.status == ChunkStatus.UPLOADED
+        }
+
+        total_chunks = len(original_chunks)
+        corrupt_chunks = sum(1 for c in original_chunks if c.status == ChunkStatus.CORRUPT)
+        failed_chunks = sum(1 for c in original_chunks if c.status == ChunkStatus.FAILED)
 
         # Check for missing chunks
-        chunk_numbers = [c.chunk_number for c in chunks.filter(is_replica=False)]
-        expected_numbers = list(range(1, max(chunk_numbers) + 1)) if chunk_numbers else []
-        missing_chunks = set(expected_numbers) - set(chunk_numbers)
+        missing_chunks = stored_file.get_missing_chunk_numbers({c.chunk_number for c in original_chunks})
 
         # Calculate health metrics
         chunk_health = ((total_chunks - corrupt_chunks - failed_chunks - len(
             missing_chunks)) / total_chunks) * 100 if total_chunks > 0 else 0
 
         # Check if file can be recovered using replicas
-        can_recover = True
-        unrecoverable_chunks = []
-
-        for chunk_num in missing_chunks:
-            valid_replica = stored_file.chunks.filter(
-                chunk_number=chunk_num,
-                is_replica=True,
-                status=ChunkStatus.UPLOADED
-            ).exists()
-
-            if not valid_replica:
-                can_recover = False
-                unrecoverable_chunks.append(chunk_num)
-
-                for chunk in chunks.filter(is_replica=False, status__in=[ChunkStatus.CORRUPT, ChunkStatus.FAILED]):
-                    valid_replica = stored_file.chunks.filter(
-                        chunk_number=chunk.chunk_number,
-                        is_replica=True,
-                        status=ChunkStatus.UPLOADED
-                    ).exists()
-
-                    if not valid_replica:
-                        can_recover = False
-                        unrecoverable_chunks.append(chunk.chunk_number)
-
-                # Determine health status
-                if not can_recover:
-                    health_status = "critical"
-                elif corrupt_chunks > 0 or failed_chunks > 0 or missing_chunks:
-                    health_status = "warning"
-                else:
-                    health_status = "healthy"
-
-                return {
-                    'id': str(stored_file.id),
-                    'name': stored_file.name,
-                    'original_filename': stored_file.original_filename,
-                    'size_bytes': stored_file.size_bytes,
-                    'can_recover': can_recover,
-                    'health_status': health_status,
-                    'chunks': {
-                        'total': total_chunks,
-                        'corrupt': corrupt_chunks,
-                        'failed': failed_chunks,
-                        'missing': len(missing_chunks),
-                        'missing_numbers': list(missing_chunks),
-                        'unrecoverable': unrecoverable_chunks,
-                        'health_percentage': round(chunk_health, 2)
-                    },
-                    'upload_date': stored_file.upload_date.isoformat()
-                }
\ No newline at end of file
+        unrecoverable_chunks = [n for n in missing_chunks if n not in replicated_numbers]
+        unrecoverable_chunks += [
+            c.chunk_number for c in original_chunks
+            if c.status in [ChunkStatus.CORRUPT, ChunkStatus.FAILED] and c.chunk_number not in replicated_numbers
+        ]
+        can_recover = not unrecoverable_chunks
+
+        # Determine health status
+        if not can_recover:
+            health_status = "critical"
+        elif corrupt_chunks > 0 or failed_chunks > 0 or missing_chunks:
+            health_status = "warning"
+        else:
+            health_status = "healthy"
+
+        return {
+            'id': str(stored_file.id),
+            'name': stored_file.name,
+            'original_filename': stored_file.original_filename,
+            'size_bytes': stored_file.size_bytes,
+            'can_recover': can_recover,
+            'health_status': health_status,
+            'chunks': {
+                'total': total_chunks,
+                'corrupt': corrupt_chunks,
+                'failed': failed_chunks,
+                'missing': len(missing_chunks),
+                'missing_numbers': list(missing_chunks),
+                'unrecoverable': unrecoverable_chunks,
+                'health_percentage': round(chunk_health, 2)
+            },
+            'upload_date': stored_file.upload_date.isoformat()
+        }
@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from django.db.models import Count, Q, Sum
 from file_storage.redundancy import RedundancyManager
 from file_storage.models import FileNode, StoredFile, FileChunk, ChunkStatus
 
@@ -125,28 +126,28 @@ class Command(BaseCommand):
         self.stdout.write(f"Active Nodes: {active_nodes}")
 
         # File stats
-        total_files = StoredFile.objects.count()
-        total_size = StoredFile.objects.all().values_list('size_bytes', flat=True)
-        total_size_bytes = sum(total_size) if total_size else 0
+        file_stats = StoredFile.objects.aggregate(total=Count('id'), total_size=Sum('size_bytes'))
+        total_files = file_stats['total']
+        total_size_bytes = file_stats['total_size'] or 0
 
         self.stdout.write(f"Total Files: {total_files}")
         self.stdout.write(f"Total Storage Size: {self.format_size(total_size_bytes)}")
 
-        # Chunk stats
-        total_chunks = FileChunk.objects.count()
-        original_chunks = FileChunk.objects.filter(is_replica=False).count()
-        replica_chunks = FileChunk.objects.filter(is_replica=True).count()
-
-        self.stdout.write(f"Total Chunks: {total_chunks}")
-        self.stdout.write(f"Original Chunks: {original_chunks}")
-        self.stdout.write(f"Replica Chunks: {replica_chunks}")
+        # Chunk and status stats in one query
+        chunk_stats = FileChunk.objects.aggregate(
+            total=Count('id'),
+            originals=Count('id', filter=Q(is_replica=False)),
+            replicas=Count('id', filter=Q(is_replica=True)),
+            corrupt=Count('id', filter=Q(status=ChunkStatus.CORRUPT)),
+            failed=Count('id', filter=Q(status=ChunkStatus.FAILED)),
+        )
 
-        # Status stats
-        corrupt_chunks = FileChunk.objects.filter(status=ChunkStatus.CORRUPT).count()
-        failed_chunks = FileChunk.objects.filter(status=ChunkStatus.FAILED).count()
+        self.stdout.write(f"Total Chunks: {chunk_stats['total']}")
+        self.stdout.write(f"Original Chunks: {chunk_stats['originals']}")
+        self.stdout.write(f"Replica Chunks: {chunk_stats['replicas']}")
 
-        self.stdout.write(f"Corrupted Chunks: {corrupt_chunks}")
-        self.stdout.write(f"Failed Chunks: {failed_chunks}")
+        self.stdout.write(f"Corrupted Chunks: {chunk_stats['corrupt']}")
+        self.stdout.write(f"Failed Chunks: {chunk_stats['failed']}")
 
     def format_size(self, size_bytes):
         """Format bytes to human-readable form"""
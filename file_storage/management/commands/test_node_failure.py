@@ -53,7 +53,7 @@ class Command(BaseCommand):
                     chunk_number=chunk.chunk_number,
                     is_replica=True
                 )
-                if replicas.count() == 0:
+                if not replicas.exists():
                     vulnerable_chunks += 1
 
             if vulnerable_chunks > 0:
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-16 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('file_storage', '0004_update_unique_constraint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='filechunk',
+            index=models.Index(fields=['file', 'is_replica', 'chunk_number'], name='filechunk_file_replica_num_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='filechunk',
+            index=models.Index(fields=['file', 'is_replica', 'status'], name='filechunk_file_replica_st_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-16 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('file_storage', '0005_filechunk_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='filechunk',
+            name='last_verified',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='filechunk',
+            name='storage_mtime',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-16 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('file_storage', '0006_filechunk_last_verified_filechunk_storage_mtime'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storedfile',
+            name='total_chunks',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
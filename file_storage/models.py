@@ -1,6 +1,8 @@
 import os
 import hashlib
+from datetime import timedelta
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 import uuid
 
@@ -45,11 +47,27 @@ class StoredFile(models.Model):
     checksum = models.CharField(max_length=64)  # SHA-256 checksum
     upload_date = models.DateTimeField(auto_now_add=True)
     last_accessed = models.DateTimeField(null=True, blank=True)
+    # Number of original chunks the file was split into (unknown for older uploads)
+    total_chunks = models.IntegerField(null=True, blank=True)
     uploader = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='uploaded_files')
 
     def __str__(self):
         return self.name
 
+    def get_missing_chunk_numbers(self, chunk_numbers):
+        """
+        Get the numbers of the original chunks that are missing
+
+        Args:
+            chunk_numbers: Set of the chunk numbers that are present
+
+        Returns:
+            set: Missing chunk numbers
+        """
+        # Older uploads don't record their chunk count; fall back to the highest present chunk
+        expected = self.total_chunks or (max(chunk_numbers) if chunk_numbers else 0)
+        return set(range(1, expected + 1)) - chunk_numbers
+
 
 class ChunkStatus(models.TextChoices):
     PENDING = 'pending', 'Pending'
@@ -76,20 +94,70 @@ class FileChunk(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # When the stored data last hashed to the checksum, and its modification time then
+    last_verified = models.DateTimeField(null=True, blank=True)
+    storage_mtime = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         # Update to allow multiple replicas per chunk by including node in the unique constraint
         unique_together = ('file', 'chunk_number', 'is_replica', 'node')
         ordering = ['chunk_number']
+        # Chunk lookups filter a file's originals or replicas by number or status
+        indexes = [
+            models.Index(fields=['file', 'is_replica', 'chunk_number'], name='filechunk_file_replica_num_idx'),
+            models.Index(fields=['file', 'is_replica', 'status'], name='filechunk_file_replica_st_idx'),
+        ]
 
     def __str__(self):
         return f"{self.file.name} - Chunk {self.chunk_number}"
 
+    def get_storage_mtime(self):
+        """Get the modification time of the stored data, or None if unavailable"""
+        from django.core.files.storage import default_storage
+
+        try:
+            return default_storage.get_modified_time(self.storage_path)
+        except Exception:
+            return None
+
+    def is_recently_verified(self, max_age=timedelta(hours=24)):
+        """
+        Fast check that trusts the last full verification, without re-hashing,
+        while the stored data's size and modification time are unchanged
+
+        This does not detect corruption that leaves the size and modification
+        time untouched, so a chunk that went bad since its last full
+        verification passes until max_age has elapsed.
+
+        Args:
+            max_age: How long a full verification is trusted for
+
+        Returns:
+            bool: True if the chunk can be treated as verified
+        """
+        from django.core.files.storage import default_storage
+
+        if self.last_verified is None or self.storage_mtime is None:
+            return False
+
+        if timezone.now() - self.last_verified > max_age:
+            return False
+
+        try:
+            return (
+                default_storage.size(self.storage_path) == self.size_bytes
+                and default_storage.get_modified_time(self.storage_path) == self.storage_mtime
+            )
+        except Exception:
+            return False
+
     def verify_integrity(self):
         """Verify the chunk's integrity by comparing checksums"""
         try:
             from django.core.files.storage import default_storage
 
+            storage_mtime = self.get_storage_mtime()
+
             # Calculate current checksum
             file_hash = hashlib.sha256()
             with default_storage.open(self.storage_path, 'rb') as f:
@@ -99,6 +167,14 @@ class FileChunk(models.Model):
 
             # Compare with stored checksum
             if calculated_checksum == self.checksum:
+                self.last_verified = timezone.now()
+                self.storage_mtime = storage_mtime
+                # Bookkeeping only: update() skips post_save, so a verification
+                # sweep doesn't clear the dashboard caches for every chunk
+                FileChunk.objects.filter(pk=self.pk).update(
+                    last_verified=self.last_verified,
+                    storage_mtime=self.storage_mtime
+                )
                 return True
             else:
                 self.status = ChunkStatus.CORRUPT
@@ -2,13 +2,16 @@ import random
 import logging
 import hashlib
 import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
 from django.db import transaction
 from django.utils import timezone
 from .models import FileChunk, FileNode, ChunkStatus, StoredFile
 from .node_manager import NodeManager
+from .signals import clear_dashboard_caches
+from .utils import copy_verified_replica, stream_checksum
 
 
 logger = logging.getLogger(__name__)
@@ -64,17 +67,19 @@ class RedundancyManager:
         # Get list of node IDs to exclude
         exclude_node_ids = [n.id for n in exclude_nodes if n is not None and hasattr(n, 'id')]
 
-        # Get active nodes excluding specified ones
-        active_nodes = FileNode.objects.filter(status='active').exclude(id__in=exclude_node_ids)
+        # Get active nodes excluding specified ones, up to min_replicas, in one query
+        candidate_nodes = list(
+            FileNode.objects.filter(status='active').exclude(id__in=exclude_node_ids)[:self.min_replicas]
+        )
 
-        if not active_nodes:
+        if not candidate_nodes:
             logger.warning(f"No active nodes available for replication of chunk {chunk.id}")
             return 0
 
         replicas_created = 0
 
         # Create a replica on each available node, up to min_replicas
-        for node in active_nodes[:self.min_replicas]:
+        for node in candidate_nodes:
             try:
                 # Skip if node is None
                 if node is None:
@@ -165,6 +170,30 @@ class RedundancyManager:
         """
         Ensure all chunks have the minimum number of replicas
 
+        Returns:
+            dict: Statistics on replicas created
+        """
+        return self._ensure_minimum_replicas(FileChunk.objects.all())
+
+    def ensure_minimum_replicas_for_file(self, stored_file):
+        """
+        Ensure the chunks of a single file have the minimum number of replicas
+
+        Args:
+            stored_file: StoredFile instance whose chunks should be checked
+
+        Returns:
+            dict: Statistics on replicas created
+        """
+        return self._ensure_minimum_replicas(FileChunk.objects.filter(file=stored_file))
+
+    def _ensure_minimum_replicas(self, chunks):
+        """
+        Create missing replicas for the original chunks in a queryset
+
+        Args:
+            chunks: FileChunk queryset to check, originals and replicas alike
+
         Returns:
             dict: Statistics on replicas created
         """
@@ -175,34 +204,36 @@ class RedundancyManager:
             'already_sufficient': 0
         }
 
+        # Load the replica counts and the nodes holding each chunk in one query
+        replica_counts = defaultdict(int)
+        nodes_with_chunk = defaultdict(set)
+        for file_id, chunk_number, node_id, is_replica, status in chunks.values_list(
+            'file_id', 'chunk_number', 'node_id', 'is_replica', 'status'
+        ):
+            key = (file_id, chunk_number)
+            if node_id is not None:
+                nodes_with_chunk[key].add(node_id)
+            if is_replica and status == ChunkStatus.UPLOADED:
+                replica_counts[key] += 1
+
         # Get all original chunks that are not corrupted
-        original_chunks = FileChunk.objects.filter(
+        original_chunks = chunks.filter(
             is_replica=False,
             status=ChunkStatus.UPLOADED
-        )
+        ).select_related('node', 'file__uploader')
 
         for chunk in original_chunks:
             stats['checked'] += 1
 
-            # Count existing replicas
-            existing_replicas = FileChunk.objects.filter(
-                file=chunk.file,
-                chunk_number=chunk.chunk_number,
-                is_replica=True,
-                status=ChunkStatus.UPLOADED
-            ).count()
+            key = (chunk.file_id, chunk.chunk_number)
+            existing_replicas = replica_counts[key]
 
             if existing_replicas >= self.min_replicas:
                 stats['already_sufficient'] += 1
                 continue
 
             # Get nodes that already have this chunk
-            nodes_with_chunk = list(FileChunk.objects.filter(
-                file=chunk.file,
-                chunk_number=chunk.chunk_number
-            ).values_list('node', flat=True).distinct())
-
-            nodes_to_exclude = FileNode.objects.filter(id__in=nodes_with_chunk)
+            nodes_to_exclude = FileNode.objects.filter(id__in=nodes_with_chunk[key])
 
             # Create additional replicas
             replicas_to_create = self.min_replicas - existing_replicas
@@ -304,20 +335,19 @@ class RedundancyManager:
 
         for replica in replicas:
             try:
-                # Verify replica integrity
                 with default_storage.open(replica.storage_path, 'rb') as f:
-                    chunk_data = f.read()
+                    # Verify replica integrity without loading it into memory
+                    if stream_checksum(f) != replica.checksum:
+                        continue
 
-                replica_hash = hashlib.sha256(chunk_data).hexdigest()
-
-                if replica_hash == replica.checksum:
                     # Valid replica found, use it to repair
                     with transaction.atomic():
                         # Create a new storage path
                         new_path = f"chunks/{corrupt_chunk.file.uploader.username}/{corrupt_chunk.file.id}_{corrupt_chunk.chunk_number}_{timezone.now().timestamp()}.chunk"
 
-                        # Save as new chunk
-                        default_storage.save(new_path, ContentFile(chunk_data))
+                        # Save as new chunk, straight from the open replica
+                        f.seek(0)
+                        default_storage.save(new_path, f)
 
                         # Update the chunk
                         corrupt_chunk.storage_path = new_path
@@ -333,6 +363,92 @@ class RedundancyManager:
         logger.error(f"Unable to repair chunk {corrupt_chunk.id}, no valid replicas found")
         return False
 
+    def repair_chunks(self, corrupt_chunks):
+        """
+        Attempt to repair several corrupted chunks, copying their replicas in parallel
+
+        Args:
+            corrupt_chunks: Iterable of corrupted FileChunk instances, with their
+                file uploaders loaded
+
+        Returns:
+            int: Number of chunks repaired
+        """
+        # For replicas, we don't repair - we just create new ones elsewhere
+        corrupt_chunks = [chunk for chunk in corrupt_chunks if not chunk.is_replica]
+        if not corrupt_chunks:
+            return 0
+
+        # Fetch the candidate replicas for every chunk in one query
+        replicas_by_chunk = defaultdict(list)
+        for replica in FileChunk.objects.filter(
+            file_id__in={chunk.file_id for chunk in corrupt_chunks},
+            chunk_number__in={chunk.chunk_number for chunk in corrupt_chunks},
+            is_replica=True,
+            status=ChunkStatus.UPLOADED
+        ):
+            replicas_by_chunk[(replica.file_id, replica.chunk_number)].append(replica)
+
+        # Work out the new storage paths up front, so the workers never touch the ORM
+        repairs = [
+            (
+                chunk,
+                replicas_by_chunk[(chunk.file_id, chunk.chunk_number)],
+                f"chunks/{chunk.file.uploader.username}/{chunk.file_id}_{chunk.chunk_number}_{timezone.now().timestamp()}.chunk"
+            )
+            for chunk in corrupt_chunks
+        ]
+
+        def copy_valid_replica(repair):
+            """Copy the first valid replica to the new path, returning that replica or None"""
+            corrupt_chunk, replicas, new_path = repair
+
+            for replica in replicas:
+                try:
+                    if not copy_verified_replica(replica, new_path):
+                        continue
+
+                    logger.info(f"Repaired chunk {corrupt_chunk.id} from replica {replica.id}")
+                    return replica
+
+                except Exception as e:
+                    logger.error(f"Error checking replica {replica.id}: {str(e)}")
+
+            logger.error(f"Unable to repair chunk {corrupt_chunk.id}, no valid replicas found")
+            return None
+
+        # Storage copies run in parallel; the chunk records are updated from this thread
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            source_replicas = list(executor.map(copy_valid_replica, repairs))
+
+        repaired_chunks = []
+        for (chunk, _, new_path), replica in zip(repairs, source_replicas):
+            if replica is None:
+                continue
+
+            chunk.storage_path = new_path
+            chunk.status = ChunkStatus.UPLOADED
+            # bulk_update does not apply auto_now by itself
+            chunk.updated_at = timezone.now()
+            repaired_chunks.append(chunk)
+
+        with transaction.atomic():
+            FileChunk.objects.bulk_update(
+                repaired_chunks, ['storage_path', 'status', 'updated_at'], batch_size=200
+            )
+            # Remember the replicas' verification, so later repairs can skip re-hashing them
+            FileChunk.objects.bulk_update(
+                [replica for replica in source_replicas if replica is not None],
+                ['last_verified', 'storage_mtime'],
+                batch_size=200
+            )
+
+        # bulk_update sends no post_save, so clear the dashboards explicitly
+        if repaired_chunks:
+            clear_dashboard_caches()
+
+        return len(repaired_chunks)
+
     def check_file_integrity(self, stored_file):
         """
         Check if a file can be fully reassembled
@@ -350,9 +466,9 @@ class RedundancyManager:
             return False, [], []
 
         # Check for missing chunks
-        chunk_numbers = [chunk.chunk_number for chunk in chunks if not chunk.is_replica]
-        expected_numbers = list(range(1, max(chunk_numbers) + 1))
-        missing = set(expected_numbers) - set(chunk_numbers)
+        missing = stored_file.get_missing_chunk_numbers(
+            {chunk.chunk_number for chunk in chunks if not chunk.is_replica}
+        )
 
         # Check for corrupted chunks
         corrupt = [chunk for chunk in chunks
@@ -106,6 +106,30 @@ class FileCache:
 
         logger.info(f"Cached file {file_id}, access count: {access_count + 1}")
 
+    @staticmethod
+    def cache_while_streaming(file_id, blocks):
+        """
+        Pass a file's data through while collecting it, and cache it once
+        the whole file has been streamed
+
+        Args:
+            file_id: UUID of the file
+            blocks: Iterable of byte strings making up the file
+
+        Yields:
+            bytes: The blocks, unchanged
+        """
+        buffer = bytearray()
+        for block in blocks:
+            buffer += block
+            yield block
+
+        # Only reached when the whole file was streamed
+        try:
+            FileCache.cache_file(file_id, bytes(buffer))
+        except Exception as e:
+            logger.warning(f"Failed to cache file {file_id}: {str(e)}")
+
     @staticmethod
     def get_cached_file(file_id):
         """
@@ -141,6 +165,31 @@ class FileCache:
         access_key = f"file_access_{file_id}"
         return cache.get(access_key, 0)
 
+    @staticmethod
+    def get_many_cache_status(file_ids):
+        """
+        Get cache status and access counts for several files in one cache call
+
+        Args:
+            file_ids: Iterable of file UUIDs
+
+        Returns:
+            dict: Maps each file id to {'is_cached': bool, 'access_count': int}
+        """
+        file_ids = list(file_ids)
+        cache_keys = [f"file_cache_{file_id}" for file_id in file_ids]
+        access_keys = [f"file_access_{file_id}" for file_id in file_ids]
+
+        values = cache.get_many(cache_keys + access_keys)
+
+        return {
+            file_id: {
+                'is_cached': values.get(cache_key) is not None,
+                'access_count': values.get(access_key, 0)
+            }
+            for file_id, cache_key, access_key in zip(file_ids, cache_keys, access_keys)
+        }
+
     @staticmethod
     def get_frequently_accessed_files(min_access_count=5):
         """
@@ -150,4 +199,4 @@ class FileCache:
         This is a placeholder since Django's cache doesn't support easy enumeration
         """
         # In production, you would use a database or specialized cache to track this
-        return []
\ No newline at end of file
+        return []
@@ -0,0 +1,29 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import FileChunk, FileNode
+
+DISTRIBUTED_DASHBOARD_CACHE_KEY = "distributed_dashboard_stats"
+HEALTH_DASHBOARD_CACHE_KEY = "health_dashboard_stats"
+
+
+def clear_dashboard_caches():
+    """Clear the cached distributed and health dashboard statistics"""
+    cache.delete_many([DISTRIBUTED_DASHBOARD_CACHE_KEY, HEALTH_DASHBOARD_CACHE_KEY])
+
+
+@receiver(post_save, sender=FileNode)
+@receiver(post_delete, sender=FileNode)
+@receiver(post_save, sender=FileChunk)
+@receiver(post_delete, sender=FileChunk)
+def invalidate_dashboard_caches(sender, **kwargs):
+    """
+    Clear the dashboard caches whenever a node or chunk changes
+
+    Queryset update(), bulk_create() and bulk_update() don't send these
+    signals, so code using them calls clear_dashboard_caches() itself.
+    """
+    # Clear after commit, so a dashboard can't re-cache the uncommitted state
+    transaction.on_commit(clear_dashboard_caches)
@@ -3,7 +3,6 @@ import hashlib
 import uuid
 import logging
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
 from django.db import transaction
 from django.utils import timezone
 from .models import StoredFile, FileChunk, FileNode, ChunkStatus
@@ -14,6 +13,64 @@ from minio.error import S3Error
 logger = logging.getLogger(__name__)
 
 
+def stream_checksum(file_obj, block_size=1024 * 1024):
+    """
+    Calculate the SHA-256 checksum of a file without loading it into memory
+
+    Args:
+        file_obj: Readable binary file object, read from its current position
+        block_size: Number of bytes hashed per read
+
+    Returns:
+        str: Hex digest of the file's data
+    """
+    file_hash = hashlib.sha256()
+    for block in iter(lambda: file_obj.read(block_size), b""):
+        file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+def copy_verified_replica(replica, storage_path):
+    """
+    Copy a replica's data to a new storage path if it passes verification
+
+    Replicas that pass the fast check are copied without being re-hashed.
+    Otherwise the replica is hashed in full, and on success its last_verified
+    and storage_mtime are updated on the instance, for the caller to save.
+
+    The fast check trades safety for speed: a replica whose data went bad
+    within the last 24 hours without its size or modification time changing
+    (e.g. silent corruption on the storage node) is copied as is, and the
+    new primary inherits the corruption until its next full verification.
+
+    Args:
+        replica: FileChunk instance to copy
+        storage_path: Path to save the copy at
+
+    Returns:
+        bool: True if the replica was copied, False if it is corrupt
+    """
+    if replica.is_recently_verified():
+        with default_storage.open(replica.storage_path, 'rb') as f:
+            default_storage.save(storage_path, f)
+        return True
+
+    storage_mtime = replica.get_storage_mtime()
+
+    with default_storage.open(replica.storage_path, 'rb') as f:
+        # Verify replica integrity, streaming it through the hash
+        if stream_checksum(f) != replica.checksum:
+            return False
+
+        # Save straight from the open replica instead of an in-memory copy
+        f.seek(0)
+        default_storage.save(storage_path, f)
+
+    replica.last_verified = timezone.now()
+    replica.storage_mtime = storage_mtime
+    return True
+
+
 class ChunkingError(Exception):
     """Exception raised for errors during file chunking process"""
     pass
@@ -30,7 +87,7 @@ class FileChunker:
     def __init__(self, chunk_size=5 * 1024 * 1024):  # Default 5MB chunks
         self.chunk_size = chunk_size
 
-    def chunk_file(self, file_obj, stored_file, user):
+    def chunk_file(self, file_obj, stored_file, user, hasher=None):
         """
         Split a file into chunks and store them across multiple nodes
 
@@ -38,6 +95,8 @@ class FileChunker:
             file_obj: The uploaded file object
             stored_file: StoredFile model instance
             user: User who uploaded the file
+            hasher: Optional hashlib object updated with the whole file's
+                data, so the file checksum is computed in the same pass
 
         Returns:
             list: List of created FileChunk instances
@@ -70,6 +129,8 @@ class FileChunker:
 
             # Calculate checksum for this chunk
             chunk_hash = hashlib.sha256(chunk_data).hexdigest()
+            if hasher is not None:
+                hasher.update(chunk_data)
 
             # Try to store on each node until one succeeds
             stored = False
@@ -235,62 +296,104 @@ class FileChunker:
 
     def reassemble_file_optimized(self, stored_file):
         """
-        Reassemble a file from its chunks with comprehensive failover support
+        Reassemble a whole file into memory, with comprehensive failover support
 
         This method can recover a file even if multiple nodes are offline
         as long as either original chunks or their replicas are available
-        on at least one working node.
+        on at least one working node. The whole file is retrieved before this
+        returns, so every error is raised here and the returned buffer is
+        always complete.
 
         Args:
             stored_file: StoredFile model instance
 
         Returns:
-            file-like object with the reassembled file
+            BytesIO: The reassembled file, positioned at the start
+
+        Raises:
+            ReassemblyError: If the file has no chunks, chunks are missing, or
+                a chunk can't be retrieved intact from any node
         """
         from io import BytesIO
-        import time
 
         # Create a buffer to hold the reassembled file
         buffer = BytesIO()
 
-        # Get all chunk numbers for this file
-        chunk_numbers = sorted(
-            FileChunk.objects.filter(file=stored_file)
-            .values_list('chunk_number', flat=True)
-            .distinct()
-        )
+        for chunk_data in self.iter_reassembled(stored_file):
+            buffer.write(chunk_data)
+
+        # Reset buffer position for reading
+        buffer.seek(0)
+        return buffer
+
+    def iter_reassembled(self, stored_file):
+        """
+        Reassemble a file lazily, one verified chunk at a time
+
+        Each chunk is read from its primary copy first and then from its
+        replicas, skipping nodes that already failed during this retrieval,
+        so only one chunk is held in memory at a time.
+
+        Errors surface in two phases:
+        - Up front, before this returns and before any bytes are produced: a
+          file with no uploaded chunks or with missing chunk numbers raises
+          ReassemblyError here. Callers building a StreamingHttpResponse can
+          therefore still return an error response, as no headers are sent yet.
+        - During iteration: if a chunk can't be retrieved intact from any node,
+          the generator raises ReassemblyError after the preceding chunks were
+          yielded. For a streaming response this happens after the headers and
+          part of the body were sent, so the download is aborted mid-body and
+          the client sees a truncated transfer rather than an error page.
+
+        Args:
+            stored_file: StoredFile model instance
+
+        Returns:
+            generator: Yields the verified data of each chunk in order
 
-        if not chunk_numbers:
+        Raises:
+            ReassemblyError: Up front if the file has no chunks or chunks are missing
+        """
+        # Get all uploaded chunks (originals and replicas) for this file in one query
+        chunks_by_number = {}
+        for chunk in FileChunk.objects.filter(
+            file=stored_file,
+            status=ChunkStatus.UPLOADED
+        ).select_related('node'):
+            chunks_by_number.setdefault(chunk.chunk_number, []).append(chunk)
+
+        if not chunks_by_number:
             logger.error(f"No chunks found for file {stored_file.id}")
             raise ReassemblyError("No chunks found for this file")
 
-        # Expected chunk numbers
-        expected_numbers = list(range(1, max(chunk_numbers) + 1))
-
         # Check for missing chunks
-        missing = set(expected_numbers) - set(chunk_numbers)
+        missing = stored_file.get_missing_chunk_numbers(set(chunks_by_number))
         if missing:
             logger.error(f"Missing chunks for file {stored_file.id}: {missing}")
             raise ReassemblyError(f"Missing chunks {missing}")
 
+        return self._iter_chunk_data(stored_file, chunks_by_number)
+
+    def _iter_chunk_data(self, stored_file, chunks_by_number):
+        """
+        Retrieve and verify each chunk in order, falling back to replicas
+
+        Args:
+            stored_file: StoredFile model instance
+            chunks_by_number: Dict mapping chunk numbers to their FileChunk instances
+
+        Yields:
+            bytes: The data of each chunk
+        """
+        import time
+
         # Track nodes that have failed during this retrieval
         failed_nodes = []
         start_time = time.time()
 
         # Reassemble the file
-        for chunk_number in expected_numbers:
-            # Try to get all available chunks (both primary and replicas) for this chunk number
-            all_chunks = list(
-                FileChunk.objects.filter(
-                    file=stored_file,
-                    chunk_number=chunk_number,
-                    status=ChunkStatus.UPLOADED
-                ).select_related('node')
-            )
-
-            if not all_chunks:
-                logger.error(f"No chunks (original or replica) found for chunk number {chunk_number}")
-                raise ReassemblyError(f"No chunks found for chunk number {chunk_number}")
+        for chunk_number in sorted(chunks_by_number):
+            all_chunks = chunks_by_number[chunk_number]
 
             # Sort chunks - prioritize non-replicas and use nodes that aren't in failed_nodes
             # This ensures we try primary chunks first, then replicas, and avoid failed nodes
@@ -302,7 +405,7 @@ class FileChunker:
             )
 
             # Try each chunk until one succeeds
-            chunk_retrieved = False
+            chunk_data = None
             for chunk in all_chunks:
                 # Skip chunks with no node
                 if not chunk.node:
@@ -326,14 +429,14 @@ class FileChunker:
                     try:
                         # Get the chunk data
                         response = client.get_object(chunk.node.bucket_name, chunk.storage_path)
-                        chunk_data = response.read()
+                        data = response.read()
                     except Exception as e:
                         logger.warning(f"Error reading chunk from node {chunk.node.name}: {str(e)}")
                         failed_nodes.append(chunk.node)
                         continue
 
                     # Verify integrity
-                    chunk_hash = hashlib.sha256(chunk_data).hexdigest()
+                    chunk_hash = hashlib.sha256(data).hexdigest()
                     if chunk_hash != chunk.checksum:
                         logger.warning(f"Checksum mismatch for chunk {chunk.id} from node {chunk.node.name}")
                         # If primary is corrupt, update its status
@@ -342,9 +445,7 @@ class FileChunker:
                             chunk.save()
                         continue
 
-                    # Write to buffer
-                    buffer.write(chunk_data)
-                    chunk_retrieved = True
+                    chunk_data = data
 
                     chunk_type = "replica" if chunk.is_replica else "primary"
                     logger.info(f"Retrieved chunk {chunk_number} ({chunk_type}) from node {chunk.node.name}")
@@ -354,20 +455,18 @@ class FileChunker:
                     logger.error(f"Error retrieving chunk {chunk_number} from node {chunk.node.name}: {str(e)}")
                     failed_nodes.append(chunk.node)
 
-            if not chunk_retrieved:
+            if chunk_data is None:
                 # If we couldn't get this chunk from any node, fail the download
                 raise ReassemblyError(
                     f"Failed to retrieve chunk {chunk_number} from any node. "
                     f"Tried {len(all_chunks)} chunks across {len(set(c.node for c in all_chunks if c.node))} nodes."
                 )
 
+            yield chunk_data
+
         end_time = time.time()
         logger.info(f"File {stored_file.id} reassembled in {end_time - start_time:.2f} seconds")
 
-        # Reset buffer position for reading
-        buffer.seek(0)
-        return buffer
-
     def get_healthy_nodes(self):
         """Get a list of currently healthy nodes"""
         active_nodes = FileNode.objects.filter(status='active')
@@ -396,20 +495,18 @@ class FileChunker:
                 # Create a new primary chunk from the replica
                 try:
                     with default_storage.open(replica.storage_path, 'rb') as f:
-                        chunk_data = f.read()
-
-                    # Verify replica integrity
-                    chunk_hash = hashlib.sha256(chunk_data).hexdigest()
-                    if chunk_hash != replica.checksum:
-                        logger.error(f"Replica for chunk {chunk_number} is corrupted")
-                        all_recovered = False
-                        continue
-
-                    # Store as a new primary chunk
-                    chunk_filename = f"{stored_file.id}_{chunk_number}_{uuid.uuid4().hex}.chunk"
-                    storage_path = f"chunks/{stored_file.uploader.username}/{chunk_filename}"
-
-                    default_storage.save(storage_path, ContentFile(chunk_data))
+                        # Verify replica integrity
+                        if stream_checksum(f) != replica.checksum:
+                            logger.error(f"Replica for chunk {chunk_number} is corrupted")
+                            all_recovered = False
+                            continue
+
+                        # Store as a new primary chunk, straight from the open replica
+                        chunk_filename = f"{stored_file.id}_{chunk_number}_{uuid.uuid4().hex}.chunk"
+                        storage_path = f"chunks/{stored_file.uploader.username}/{chunk_filename}"
+
+                        f.seek(0)
+                        default_storage.save(storage_path, f)
 
                     # Create new chunk record
                     FileChunk.objects.create(
@@ -1,20 +1,24 @@
 import hashlib
 import os
 import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 
 from django.contrib import messages
 from django.contrib.auth import logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.core.cache import cache
-from django.core.files.base import ContentFile
-from django.core.files.storage import default_storage
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.db.models import Count, Sum
+from django.db import connection, transaction
+from django.db.models import Count, Exists, Max, OuterRef, Sum
 from django.db.models import Q
-from django.http import FileResponse, Http404, HttpResponse
+from django.http import FileResponse, Http404, StreamingHttpResponse
 from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.utils import timezone
+from django.utils.http import content_disposition_header
+from django.views.decorators.cache import cache_page
 
 from .forms import FileUploadForm
 from .health import SystemHealth
@@ -22,26 +26,42 @@ from .models import FileNode, FileChunk, StoredFile, ChunkStatus
 from .node_manager import NodeManager, logger
 from .redundancy import RedundancyManager
 from .retrieval import FileCache
-from .utils import FileChunker
+from .signals import DISTRIBUTED_DASHBOARD_CACHE_KEY, HEALTH_DASHBOARD_CACHE_KEY, clear_dashboard_caches
+from .utils import FileChunker, copy_verified_replica
 
 
-@login_required
-@user_passes_test(lambda u: u.is_staff)
-@login_required
-@user_passes_test(lambda u: u.is_staff)
-def distributed_dashboard(request):
-    """Dashboard for monitoring the distributed system"""
-    # Get unique nodes with health information
-    all_nodes = FileNode.objects.all().order_by('priority')
+def _get_distributed_dashboard_context():
+    """Collect node, cluster and replication statistics for the distributed dashboard"""
+    # Get unique nodes with health information, with every node's chunk counts
+    # and space used from the same query
+    all_nodes = FileNode.objects.only('id', 'name', 'hostname', 'port', 'status', 'is_primary', 'priority')
+
+    def with_chunk_stats(node_queryset):
+        return SystemHealth.annotate_chunk_counts(node_queryset).annotate(
+            space_used=Sum('stored_chunks__size_bytes')
+        )
+
+    if connection.features.can_distinct_on_fields:
+        # Keep the highest priority node per address in the database (DISTINCT ON).
+        # annotate() can't be combined with distinct(fields), so deduplicate in a
+        # subquery and annotate the outer query
+        unique_node_ids = (
+            FileNode.objects.order_by('hostname', 'port', 'priority')
+            .distinct('hostname', 'port')
+            .values('id')
+        )
+        unique_nodes = with_chunk_stats(all_nodes.filter(id__in=unique_node_ids))
+        nodes = sorted(unique_nodes, key=lambda n: n.priority)
+    else:
+        # Create a dictionary to filter unique nodes
+        unique_nodes = {}
+        for node in with_chunk_stats(all_nodes).order_by('priority'):
+            key = f"{node.hostname}:{node.port}"
+            if key not in unique_nodes:
+                unique_nodes[key] = node
 
-    # Create a dictionary to filter unique nodes
-    unique_nodes = {}
-    for node in all_nodes:
-        key = f"{node.hostname}:{node.port}"
-        if key not in unique_nodes:
-            unique_nodes[key] = node
+        nodes = list(unique_nodes.values())
 
-    nodes = list(unique_nodes.values())
     node_data = []
 
     for node in nodes:
@@ -52,23 +72,14 @@ def distributed_dashboard(request):
         if node.status != 'active':
             health_status = "inactive"
             health_percentage = 0
-        else:
-            # Count chunks on this node
-            total_chunks = node.stored_chunks.count()
-            corrupt_chunks = node.stored_chunks.filter(status=ChunkStatus.CORRUPT).count()
-            failed_chunks = node.stored_chunks.filter(status=ChunkStatus.FAILED).count()
-
-            if total_chunks > 0:
-                healthy_percentage = ((total_chunks - corrupt_chunks - failed_chunks) / total_chunks) * 100
-                health_percentage = round(healthy_percentage)
-
-                if healthy_percentage < 80:
-                    health_status = "critical"
-                elif healthy_percentage < 95:
-                    health_status = "warning"
+        elif node.total_chunks > 0:
+            healthy_percentage = ((node.total_chunks - node.corrupt_chunks - node.failed_chunks) / node.total_chunks) * 100
+            health_percentage = round(healthy_percentage)
 
-        # Calculate space used
-        space_used = node.stored_chunks.aggregate(total=Sum('size_bytes'))['total'] or 0
+            if healthy_percentage < 80:
+                health_status = "critical"
+            elif healthy_percentage < 95:
+                health_status = "warning"
 
         node_data.append({
             'id': node.id,
@@ -80,8 +91,8 @@ def distributed_dashboard(request):
             'priority': node.priority,
             'health_status': health_status,
             'health_percentage': health_percentage,
-            'chunk_count': node.stored_chunks.count(),
-            'space_used': space_used
+            'chunk_count': node.total_chunks,
+            'space_used': node.space_used or 0
         })
 
     # Get cluster status information
@@ -100,34 +111,36 @@ def distributed_dashboard(request):
         primary_node = NodeManager.get_primary_node()
 
     # Get replication information
-    original_chunks = FileChunk.objects.filter(is_replica=False).count()
-    replica_chunks = FileChunk.objects.filter(is_replica=True).count()
+    chunk_totals = FileChunk.objects.aggregate(
+        originals=Count('id', filter=Q(is_replica=False)),
+        replicas=Count('id', filter=Q(is_replica=True)),
+    )
+    original_chunks = chunk_totals['originals']
+    replica_chunks = chunk_totals['replicas']
 
     replication_factor = round(replica_chunks / original_chunks, 1) if original_chunks > 0 else 0
 
-    # Get files with replication issues
-    files_with_issues = 0
-    files_needing_replication = []
-
-    for stored_file in StoredFile.objects.all():
-        file_chunks = FileChunk.objects.filter(file=stored_file, is_replica=False)
-
-        for chunk in file_chunks:
-            replicas = FileChunk.objects.filter(
-                file=stored_file,
-                chunk_number=chunk.chunk_number,
-                is_replica=True,
-                status=ChunkStatus.UPLOADED
-            ).count()
-
-            if replicas < 1:  # We want at least 1 replica per chunk
-                files_with_issues += 1
-                files_needing_replication.append({
-                    'id': stored_file.id,
-                    'name': stored_file.name,
-                    'missing_replicas': 1 - replicas
-                })
-                break
+    # Get files with replication issues, i.e. with an original chunk that has
+    # no uploaded replica. NOT EXISTS lets the database stop at the first match.
+    uploaded_replicas = FileChunk.objects.filter(
+        file=OuterRef('file'),
+        chunk_number=OuterRef('chunk_number'),
+        is_replica=True,
+        status=ChunkStatus.UPLOADED
+    )
+    unreplicated_chunks = FileChunk.objects.filter(is_replica=False).filter(~Exists(uploaded_replicas))
+
+    files_needing_replication = [
+        {
+            'id': stored_file['id'],
+            'name': stored_file['name'],
+            'missing_replicas': 1  # We want at least 1 replica per chunk
+        }
+        for stored_file in StoredFile.objects.filter(
+            id__in=unreplicated_chunks.values('file_id')
+        ).values('id', 'name')
+    ]
+    files_with_issues = len(files_needing_replication)
 
     context = {
         'nodes': node_data,
@@ -140,6 +153,17 @@ def distributed_dashboard(request):
         'files_needing_replication': files_needing_replication,
     }
 
+    return context
+
+
+@login_required
+@user_passes_test(lambda u: u.is_staff)
+def distributed_dashboard(request):
+    """Dashboard for monitoring the distributed system"""
+    # The statistics are cluster-wide and expensive to collect, so share them
+    # between requests for a short time (cleared when nodes or replicas change)
+    context = cache.get_or_set(DISTRIBUTED_DASHBOARD_CACHE_KEY, _get_distributed_dashboard_context, 30)
+
     return render(request, 'file_storage/distributed_dashboard.html', context)
 
 
@@ -148,22 +172,23 @@ def distributed_dashboard(request):
 def change_node_status(request, node_id):
     """Change a node's status"""
     if request.method == 'POST':
-        node = get_object_or_404(FileNode, id=node_id)
+        node = get_object_or_404(FileNode.objects.values('name', 'status', 'is_primary'), id=node_id)
         status = request.POST.get('status')
 
         if status in ['active', 'inactive', 'maintenance']:
-            old_status = node.status
-            node.status = status
-            node.save()
+            old_status = node['status']
+            # updated_at is auto_now, which update() does not apply by itself
+            FileNode.objects.filter(id=node_id).update(status=status, updated_at=timezone.now())
 
-            # Clear cache to ensure updated status is shown
-            cache_key = "node_load_stats"
-            cache.delete(cache_key)
+            # Clear cache to ensure updated status is shown; update() sends no
+            # post_save, so the dashboards are cleared explicitly
+            cache.delete("node_load_stats")
+            clear_dashboard_caches()
 
-            messages.success(request, f"Node '{node.name}' status changed from '{old_status}' to '{status}'.")
+            messages.success(request, f"Node '{node['name']}' status changed from '{old_status}' to '{status}'.")
 
             # If this was the primary node being deactivated, elect a new primary
-            if old_status == 'active' and status != 'active' and node.is_primary:
+            if old_status == 'active' and status != 'active' and node['is_primary']:
                 new_primary = NodeManager.get_primary_node()
                 if new_primary:
                     messages.info(request, f"Node '{new_primary.name}' is now the primary node.")
@@ -181,7 +206,8 @@ def replicate_file(request, file_id):
         stored_file = get_object_or_404(StoredFile, id=file_id)
 
         redundancy_manager = RedundancyManager(min_replicas=1)
-        chunks = FileChunk.objects.filter(file=stored_file, is_replica=False)
+        # create_replicas_for_chunk reads each chunk's node and uploader
+        chunks = FileChunk.objects.filter(file=stored_file, is_replica=False).select_related('node', 'file__uploader')
 
         replicas_created = 0
         for chunk in chunks:
@@ -199,19 +225,24 @@ def replicate_file(request, file_id):
 @login_required
 def health_dashboard(request):
     """View for monitoring system health"""
-    # Get overall system health
-    system_status = SystemHealth.get_overall_status()
-
-    # Get node health
-    nodes = FileNode.objects.all()
-    node_health = [SystemHealth.get_node_health(node) for node in nodes]
+    # Get overall system and node health, shared between requests for a short time
+    cluster_health = cache.get_or_set(
+        HEALTH_DASHBOARD_CACHE_KEY,
+        lambda: {
+            'system_status': SystemHealth.get_overall_status(),
+            'nodes': [
+                SystemHealth.get_node_health(node)
+                for node in SystemHealth.annotate_chunk_counts(FileNode.objects.all())
+            ],
+        },
+        30
+    )
+    system_status = cluster_health['system_status']
+    node_health = cluster_health['nodes']
 
     # Get user files with health issues
-    files = StoredFile.objects.filter(uploader=request.user)
-    files_health = [SystemHealth.get_file_health(f) for f in files]
-
-    # Filter out None values before trying to access their keys
-    files_health = [f for f in files_health if f is not None]
+    files = StoredFile.objects.filter(uploader=request.user).prefetch_related('chunks')
+    files_health = [SystemHealth.get_file_health_from_prefetched(f, f.chunks.all()) for f in files]
     files_with_issues = [f for f in files_health if f['health_status'] != 'healthy']
 
     context = {
@@ -229,94 +260,116 @@ def repair_file(request, file_id):
         file_uuid = uuid.UUID(file_id)
         stored_file = get_object_or_404(StoredFile, id=file_uuid, uploader=request.user)
 
-        # Check file health
-        health = SystemHealth.get_file_health(stored_file)
+        # Check file health: one aggregate over the original chunks shows whether
+        # any are corrupt, failed or missing, without loading the chunks
+        chunk_stats = stored_file.chunks.filter(is_replica=False).aggregate(
+            problems=Count('id', filter=Q(status__in=[ChunkStatus.CORRUPT, ChunkStatus.FAILED])),
+            present=Count('chunk_number', distinct=True),
+            highest=Max('chunk_number'),
+        )
+        # Older uploads don't record their chunk count; fall back to the highest present chunk
+        expected_chunks = stored_file.total_chunks or chunk_stats['highest'] or 0
 
-        if health['health_status'] == 'healthy':
+        if chunk_stats['problems'] == 0 and chunk_stats['present'] == expected_chunks:
             messages.info(request, f'File "{stored_file.name}" is already healthy.')
             return redirect('file_storage:file_details', file_id=file_id)
 
         # If file is not healthy, attempt repair
         redundancy_manager = RedundancyManager()
 
-        # Repair all chunks of this file
-        repaired_chunks = 0
-        failed_chunks = 0
-
         # Process corrupt and failed chunks
         corrupt_chunks = FileChunk.objects.filter(
             file=stored_file,
             is_replica=False,
             status__in=[ChunkStatus.CORRUPT, ChunkStatus.FAILED]
-        )
+        ).select_related('file__uploader')
 
-        for chunk in corrupt_chunks:
-            if redundancy_manager.repair_chunk(chunk):
-                repaired_chunks += 1
-            else:
-                failed_chunks += 1
+        # Repair them as one batch, overlapping the storage round-trips
+        corrupt_chunks = list(corrupt_chunks)
+        repaired_chunks = redundancy_manager.repair_chunks(corrupt_chunks)
+        failed_chunks = len(corrupt_chunks) - repaired_chunks
 
-        # Check for missing chunks
-        chunks = stored_file.chunks.filter(is_replica=False)
-        chunk_numbers = [chunk.chunk_number for chunk in chunks]
-        expected_numbers = list(range(1, max(chunk_numbers) + 1)) if chunk_numbers else []
-        missing_chunks = set(expected_numbers) - set(chunk_numbers)
+        # Check for missing chunks, loading only the chunk numbers
+        chunk_numbers = set(
+            stored_file.chunks.filter(is_replica=False).values_list('chunk_number', flat=True)
+        )
+        missing_chunks = stored_file.get_missing_chunk_numbers(chunk_numbers)
 
         # Try to recover missing chunks from replicas
-        missing_repaired = 0
         missing_failed = 0
 
-        for chunk_num in missing_chunks:
-            # Find a replica for this chunk
-            replica = FileChunk.objects.filter(
+        # Fetch the candidate replicas for every missing chunk in one query
+        replicas_by_chunk = {
+            replica.chunk_number: replica
+            for replica in FileChunk.objects.filter(
                 file=stored_file,
-                chunk_number=chunk_num,
+                chunk_number__in=missing_chunks,
                 is_replica=True,
                 status=ChunkStatus.UPLOADED
-            ).first()
+            ).select_related('node')
+        }
+
+        replicas = []
+        for chunk_num in missing_chunks:
+            # Find a replica for this chunk
+            replica = replicas_by_chunk.get(chunk_num)
 
             if replica:
-                try:
-                    # Read the replica
-                    with default_storage.open(replica.storage_path, 'rb') as f:
-                        chunk_data = f.read()
-
-                    # Verify replica integrity
-                    replica_hash = hashlib.sha256(chunk_data).hexdigest()
-
-                    if replica_hash == replica.checksum:
-                        # Create a new primary chunk from the replica
-                        chunk_filename = f"{stored_file.id}_{chunk_num}_{uuid.uuid4().hex}.chunk"
-                        storage_path = f"chunks/{stored_file.uploader.username}/{chunk_filename}"
-
-                        default_storage.save(storage_path, ContentFile(chunk_data))
-
-                        # Create new chunk record
-                        FileChunk.objects.create(
-                            file=stored_file,
-                            chunk_number=chunk_num,
-                            size_bytes=replica.size_bytes,
-                            checksum=replica.checksum,
-                            storage_path=storage_path,
-                            node=replica.node,
-                            is_replica=False,
-                            status=ChunkStatus.UPLOADED
-                        )
-
-                        missing_repaired += 1
-                    else:
-                        missing_failed += 1
-                except Exception as e:
-                    missing_failed += 1
+                replicas.append(replica)
             else:
                 missing_failed += 1
 
-        # Create additional replicas if needed
+        username = stored_file.uploader.username
+
+        def copy_replica(replica):
+            """Copy a verified replica to a new primary path, returning the path or None"""
+            chunk_filename = f"{stored_file.id}_{replica.chunk_number}_{uuid.uuid4().hex}.chunk"
+            storage_path = f"chunks/{username}/{chunk_filename}"
+
+            try:
+                return storage_path if copy_verified_replica(replica, storage_path) else None
+            except Exception:
+                return None
+
+        # Storage copies run in parallel; chunk records are written from this thread
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            storage_paths = list(executor.map(copy_replica, replicas))
+
+        new_chunks = []
+        copied_replicas = []
+        for replica, storage_path in zip(replicas, storage_paths):
+            if storage_path is None:
+                missing_failed += 1
+                continue
+
+            copied_replicas.append(replica)
+
+            new_chunks.append(FileChunk(
+                file=stored_file,
+                chunk_number=replica.chunk_number,
+                size_bytes=replica.size_bytes,
+                checksum=replica.checksum,
+                storage_path=storage_path,
+                node=replica.node,
+                is_replica=False,
+                status=ChunkStatus.UPLOADED
+            ))
+
+        with transaction.atomic():
+            # Create the new chunk records with batched INSERTs
+            FileChunk.objects.bulk_create(new_chunks, batch_size=500)
+            # Remember the replicas' verification, so later repairs can skip re-hashing them
+            FileChunk.objects.bulk_update(copied_replicas, ['last_verified', 'storage_mtime'], batch_size=500)
+        missing_repaired = len(new_chunks)
+
+        # Create additional replicas for this file's chunks if needed
         redundancy_manager.min_replicas = 2  # Ensure we have at least 2 replicas
-        redundancy_manager.ensure_minimum_replicas()
+        redundancy_manager.ensure_minimum_replicas_for_file(stored_file)
 
         # Check final health status
         final_health = SystemHealth.get_file_health(stored_file)
+        # The repaired chunks were written with bulk_update/bulk_create, which send no signals
+        clear_dashboard_caches()
 
         if final_health['health_status'] == 'healthy':
             messages.success(
@@ -351,44 +404,60 @@ def repair_file(request, file_id):
 def dashboard(request):
     """Main dashboard view for file storage system"""
     files = StoredFile.objects.filter(uploader=request.user).order_by('-upload_date')
-    nodes = FileNode.objects.all()
-
-    # Count all chunks (including replicas)
-    total_chunks = FileChunk.objects.filter(file__uploader=request.user).count()
-
-    # Count original chunks (non-replicas)
-    original_chunks = FileChunk.objects.filter(
-        file__uploader=request.user,
-        is_replica=False
-    ).count()
+    # Only the node card columns, with each node's chunk count in the same query
+    nodes = FileNode.objects.only('id', 'name', 'hostname', 'port', 'status').annotate(
+        chunk_count=Count('stored_chunks')
+    )
+
+    # Total size in one query; the file count comes from the paginator's COUNT
+    total_size = files.aggregate(total_size=Sum('size_bytes'))['total_size'] or 0
+
+    # Count all chunks, originals and replicas in one query
+    chunk_stats = FileChunk.objects.filter(file__uploader=request.user).aggregate(
+        total=Count('id'),
+        originals=Count('id', filter=Q(is_replica=False)),
+        replicas=Count('id', filter=Q(is_replica=True)),
+    )
+
+    # Pagination, so only the rendered page of files is loaded
+    paginator = Paginator(files.only('id', 'name', 'size_bytes', 'file_type', 'upload_date'), 20)
+    page = request.GET.get('page')
 
-    # Count replicas
-    replica_chunks = FileChunk.objects.filter(
-        file__uploader=request.user,
-        is_replica=True
-    ).count()
+    try:
+        files_page = paginator.page(page)
+    except PageNotAnInteger:
+        # If page is not an integer, deliver first page
+        files_page = paginator.page(1)
+    except EmptyPage:
+        # If page is out of range, deliver last page of results
+        files_page = paginator.page(paginator.num_pages)
 
     context = {
-        'files': files,
+        'files': files_page,
+        'paginator': paginator,
         'nodes': nodes,
-        'total_files': files.count(),
-        'total_size': sum(f.size_bytes for f in files) if files else 0,
-        'total_chunks': total_chunks,
-        'original_chunks': original_chunks,
-        'replica_chunks': replica_chunks,
+        'total_files': paginator.count,
+        'total_size': total_size,
+        'total_chunks': chunk_stats['total'],
+        'original_chunks': chunk_stats['originals'],
+        'replica_chunks': chunk_stats['replicas'],
     }
 
     return render(request, 'file_storage/dashboard.html', context)
 
+@cache_page(5)
 def system_status(request):
     """API endpoint to check system status"""
-    nodes = FileNode.objects.all()
-    active_nodes = nodes.filter(status='active').count()
+    # Status pollers hit this often; count total and active nodes in one query
+    node_stats = FileNode.objects.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(status='active')),
+    )
 
     return JsonResponse({
-        'status': 'operational' if active_nodes > 0 else 'degraded',
-        'total_nodes': nodes.count(),
-        'active_nodes': active_nodes,
+        'status': 'operational' if node_stats['active'] > 0 else 'degraded',
+        'total_nodes': node_stats['total'],
+        'active_nodes': node_stats['active'],
     })
 
 
@@ -418,23 +487,14 @@ def upload_file(request):
             try:
                 uploaded_file = request.FILES['file']
 
-                # Generate file checksum
-                file_hash = hashlib.sha256()
-                for chunk in uploaded_file.chunks():
-                    file_hash.update(chunk)
-                checksum = file_hash.hexdigest()
-
-                # Reset file pointer
-                uploaded_file.seek(0)
-
-                # Create file record
+                # Create file record, the checksum is filled in once the file is chunked
                 stored_file = StoredFile(
                     name=form.cleaned_data.get('description') or uploaded_file.name,
                     original_filename=uploaded_file.name,
                     file_type=os.path.splitext(uploaded_file.name)[1],
                     size_bytes=uploaded_file.size,
                     content_type=uploaded_file.content_type,
-                    checksum=checksum,
+                    checksum='',
                     uploader=request.user
                 )
                 stored_file.save()
@@ -444,7 +504,9 @@ def upload_file(request):
 
                 # Create chunks - ensure we get a proper list back
                 try:
-                    file_chunks = chunker.chunk_file(uploaded_file, stored_file, request.user)
+                    # Generate file checksum while chunking, so the file is only read once
+                    file_hash = hashlib.sha256()
+                    file_chunks = chunker.chunk_file(uploaded_file, stored_file, request.user, hasher=file_hash)
 
                     # Convert to list if needed
                     if hasattr(file_chunks, 'all'):
@@ -458,6 +520,10 @@ def upload_file(request):
                     logger.error(f"Error during file chunking: {str(chunking_error)}")
                     raise Exception(f"Failed to process file chunks: {str(chunking_error)}")
 
+                stored_file.checksum = file_hash.hexdigest()
+                stored_file.total_chunks = chunk_count
+                stored_file.save(update_fields=['checksum', 'total_chunks'])
+
                 # Create replicas if possible
                 try:
                     redundancy_manager = RedundancyManager(min_replicas=1)
@@ -499,98 +565,24 @@ def upload_file(request):
     return render(request, 'file_storage/upload.html', context)
 
 
-# In file_storage/views.py
-
-@login_required
-# In file_storage/views.py
-
-@login_required
-# In file_storage/views.py
-
-@login_required
-def download_file(request, file_id):
-    """Download a file with comprehensive failover capability"""
-    try:
-        # Get the file
-        stored_file = get_object_or_404(StoredFile, id=file_id, uploader=request.user)
-
-        # Update last accessed time
-        stored_file.last_accessed = timezone.now()
-        stored_file.save()
-
-        # First try to get from cache
-        cached_file = FileCache.get_cached_file(file_id)
-        if cached_file:
-            logger.info(f"Serving cached file {stored_file.name}")
-
-            # Create response with even stronger download headers
-            response = HttpResponse(cached_file.read())
-            response['Content-Type'] = 'application/octet-stream'  # Force binary download
-            response['Content-Disposition'] = f'attachment; filename="{stored_file.original_filename}"'
-            response['Content-Length'] = len(cached_file.read())
-            cached_file.seek(0)  # Reset after reading
-
-            return response
-
-        # If not cached, reassemble from chunks with enhanced failover support
-        chunker = FileChunker()
-
-        try:
-            logger.info(f"Reassembling file {stored_file.name} with failover support")
-            reassembled_file = chunker.reassemble_file_optimized(stored_file)
-
-            # Read the entire file into memory for serving
-            file_data = reassembled_file.read()
-
-            # Cache the file for future access (if it's not too large)
-            if stored_file.size_bytes < 50 * 1024 * 1024:  # Only cache files under 50MB
-                try:
-                    FileCache.cache_file(file_id, file_data)
-                except Exception as cache_error:
-                    logger.warning(f"Failed to cache file {stored_file.name}: {str(cache_error)}")
-
-            # Create response with stronger download headers
-            response = HttpResponse(file_data)
-            response['Content-Type'] = 'application/octet-stream'  # Force binary download
-            response['Content-Disposition'] = f'attachment; filename="{stored_file.original_filename}"'
-            response['Content-Length'] = len(file_data)
-
-            # Additional headers to prevent display in browser
-            response['X-Content-Type-Options'] = 'nosniff'
-            response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-            response['Pragma'] = 'no-cache'
-            response['Expires'] = '0'
-
-            return response
-
-        except Exception as e:
-            logger.error(f"Error reassembling file {stored_file.name}: {str(e)}")
-
-            # Return error page that will hide the loader
-            return render(request, 'file_storage/download_error.html', {
-                'error_message': f"Error downloading file: {str(e)}",
-                'file_id': file_id
-            })
-
-    except StoredFile.DoesNotExist:
-        # File not found
-        return render(request, 'file_storage/download_error.html', {
-            'error_message': "The requested file does not exist or you don't have permission to access it.",
-            'file_id': None
-        })
-
 @login_required
 def file_details(request, file_id):
     """Display detailed information about a file"""
     try:
         stored_file = StoredFile.objects.get(id=file_id, uploader=request.user)
-        chunks = stored_file.chunks.all().order_by('chunk_number')
+        # Every chunk is rendered, so load them once and derive the counts from the list
+        chunks = list(
+            stored_file.chunks.select_related('node')
+            # file is kept so the related manager can attach stored_file without a query per row
+            .only('id', 'file', 'chunk_number', 'size_bytes', 'is_replica', 'status', 'node__name')
+            .order_by('chunk_number')
+        )
 
         context = {
             'file': stored_file,
             'chunks': chunks,
-            'total_chunks': chunks.count(),
-            'unique_nodes': len(set(chunk.node_id for chunk in chunks if chunk.node)),
+            'total_chunks': len(chunks),
+            'unique_nodes': len({chunk.node_id for chunk in chunks if chunk.node_id is not None}),
         }
 
         return render(request, 'file_storage/file_details.html', context)
@@ -603,38 +595,45 @@ def file_details(request, file_id):
 def download_file(request, file_id):
     """Download a file using optimized retrieval"""
     try:
-        # Get the file
-        stored_file = StoredFile.objects.get(id=file_id, uploader=request.user)
+        # Get the file, loading only the columns the response and reassembly use
+        stored_file = StoredFile.objects.only(
+            'id', 'original_filename', 'content_type', 'size_bytes', 'total_chunks', 'last_accessed', 'uploader'
+        ).get(id=file_id, uploader=request.user)
 
-        # Update last accessed time
-        stored_file.last_accessed = timezone.now()
-        stored_file.save()
+        # Update last accessed time with a single-column UPDATE, at most once a
+        # minute so repeated downloads don't each write the row
+        now = timezone.now()
+        if stored_file.last_accessed is None or (now - stored_file.last_accessed).total_seconds() > 60:
+            StoredFile.objects.filter(pk=stored_file.pk).update(last_accessed=now)
 
         # Check cache first
         cached_file = FileCache.get_cached_file(file_id)
         if cached_file:
             response = FileResponse(
-                cached_file,
+                BytesIO(cached_file),
                 as_attachment=True,
                 filename=stored_file.original_filename
             )
             return response
 
-        # If not cached, reassemble from chunks
-        # Using enhanced chunker with NodeSelector
+        # If not cached, reassemble from chunks as the response streams,
+        # so only one chunk is held in memory at a time. Missing chunks raise
+        # here and are handled below; a chunk that can't be retrieved later
+        # aborts the stream mid-body.
         chunker = FileChunker()
-        reassembled_file = chunker.reassemble_file_optimized(stored_file)
+        blocks = chunker.iter_reassembled(stored_file)
 
-        # Cache the file for future retrievals
-        FileCache.cache_file(file_id, reassembled_file.read())
-        reassembled_file.seek(0)  # Reset file pointer after reading
+        # Cache the file for future retrievals as it streams (if it's not too large)
+        if stored_file.size_bytes < 50 * 1024 * 1024:  # Only cache files under 50MB
+            blocks = FileCache.cache_while_streaming(file_id, blocks)
 
         # Create response
-        response = FileResponse(
-            reassembled_file,
-            as_attachment=True,
-            filename=stored_file.original_filename
+        response = StreamingHttpResponse(
+            blocks,
+            content_type=stored_file.content_type or 'application/octet-stream'
         )
+        response['Content-Disposition'] = content_disposition_header(True, stored_file.original_filename)
+        response['Content-Length'] = stored_file.size_bytes
         return response
 
     except StoredFile.DoesNotExist:
@@ -647,27 +646,42 @@ def download_file(request, file_id):
 @login_required
 def analytics_dashboard(request):
     """Dashboard for viewing file access analytics"""
-    # Get user's files
-    files = StoredFile.objects.filter(uploader=request.user).order_by('-last_accessed')
+    # Get user's files, loading only the columns the analytics table shows
+    files = list(
+        StoredFile.objects.filter(uploader=request.user)
+        .only('id', 'name', 'size_bytes', 'last_accessed')
+        .order_by('-last_accessed')
+    )
+
+    # Get node distribution of original chunks for all files in one grouped query
+    node_distributions = defaultdict(list)
+    chunk_counts = defaultdict(int)
+    distribution_rows = (
+        FileChunk.objects.filter(file__uploader=request.user, is_replica=False)
+        .values('file_id', 'node__name')
+        .annotate(count=Count('id'))
+        .order_by('file_id', '-count')
+    )
+    for row in distribution_rows:
+        node_distributions[row['file_id']].append({'node__name': row['node__name'], 'count': row['count']})
+        chunk_counts[row['file_id']] += row['count']
+
+    # Get cache status for all files in a single cache round-trip
+    cache_status = FileCache.get_many_cache_status(file.id for file in files)
 
     # Get access statistics (in a real implementation, these would come from a database)
     file_stats = []
     for file in files:
         # Get cache status
-        is_cached = FileCache.is_file_cached(file.id)
-        access_count = FileCache.get_access_count(file.id)
+        is_cached = cache_status[file.id]['is_cached']
+        access_count = cache_status[file.id]['access_count']
 
         # Get node distribution information
-        node_distribution = (
-            FileChunk.objects.filter(file=file, is_replica=False)
-            .values('node__name')
-            .annotate(count=Count('id'))
-            .order_by('-count')
-        )
+        node_distribution = node_distributions[file.id]
 
         # Calculate size distribution
         total_size = file.size_bytes
-        chunk_count = FileChunk.objects.filter(file=file, is_replica=False).count()
+        chunk_count = chunk_counts[file.id]
         avg_chunk_size = total_size / chunk_count if chunk_count else 0
 
         file_stats.append({
@@ -789,22 +803,31 @@ def enhanced_file_details(request, file_id):
     from .health import SystemHealth
     file_health = SystemHealth.get_file_health(file)
 
-    # Get chunk information with replica counts
-    original_chunks = FileChunk.objects.filter(file=file, is_replica=False).order_by('chunk_number')
+    # Get chunk information with replica counts; every row is rendered, so
+    # load them once and derive the counts from the list
+    original_chunks = list(
+        FileChunk.objects.filter(file=file, is_replica=False)
+        .select_related('node')
+        .order_by('chunk_number')
+    )
+
+    # Count replicas for every chunk number in one grouped query
+    replica_counts = dict(
+        FileChunk.objects.filter(file=file, is_replica=True)
+        .values('chunk_number')
+        .annotate(count=Count('id'))
+        .values_list('chunk_number', 'count')
+    )
 
     # Calculate replica factor
-    total_original_chunks = original_chunks.count()
-    total_replica_chunks = FileChunk.objects.filter(file=file, is_replica=True).count()
+    total_original_chunks = len(original_chunks)
+    total_replica_chunks = sum(replica_counts.values())
     replica_factor = round(total_replica_chunks / total_original_chunks, 1) if total_original_chunks > 0 else 0
 
     # Prepare enhanced chunk data
     chunks_with_replicas = []
     for chunk in original_chunks:
-        replica_count = FileChunk.objects.filter(
-            file=file,
-            chunk_number=chunk.chunk_number,
-            is_replica=True
-        ).count()
+        replica_count = replica_counts.get(chunk.chunk_number, 0)
 
         chunks_with_replicas.append({
             'chunk_number': chunk.chunk_number,
@@ -815,21 +838,23 @@ def enhanced_file_details(request, file_id):
             'replica_count': replica_count
         })
 
-    # Calculate average chunk size
-    avg_chunk_size = file.size_bytes / total_original_chunks if total_original_chunks > 0 else 0
-
-    # Check if file is cached
-    file_cached = FileCache.is_file_cached(file_id)
+    # Calculate average chunk size from the stored chunk sizes
+    avg_chunk_size = (
+        sum(chunk.size_bytes for chunk in original_chunks) / total_original_chunks
+        if total_original_chunks > 0 else 0
+    )
 
-    # Get access count
-    access_count = FileCache.get_access_count(file_id)
+    # Check if file is cached and get its access count in one cache call
+    cache_status = FileCache.get_many_cache_status([file.id])[file.id]
+    file_cached = cache_status['is_cached']
+    access_count = cache_status['access_count']
 
     context = {
         'file': file,
         'file_health': file_health,
         'chunks_with_replicas': chunks_with_replicas,
         'total_chunks': total_original_chunks,
-        'unique_nodes': len(set(chunk.node_id for chunk in original_chunks if chunk.node)),
+        'unique_nodes': len({chunk.node_id for chunk in original_chunks if chunk.node_id is not None}),
         'replica_factor': replica_factor,
         'avg_chunk_size': avg_chunk_size,
         'file_cached': file_cached,